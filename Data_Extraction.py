@@ -4,32 +4,64 @@ AASLD Practice Guidelines Scraper - Complete Workflow
 HTML + PDF Processing with Full Content in JSON
 """
 
+import argparse
+import asyncio
+import contextlib
 import hashlib
+import io
 import json
+import os
+import queue
 import re
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Optional, Dict
 
 import requests
-from bs4 import BeautifulSoup, Tag, NavigableString
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, Tag, NavigableString, CData
+import lxml.html
+from lxml import etree
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from urllib.parse import urljoin, urlparse
 
-# PDF processing
+# PDF processing (PDFium preferred, PyPDF2 as fallback)
 try:
-    import PyPDF2
-    PDF_SUPPORT = True
+    import pypdfium2 as pdfium
+    PDF_BACKEND = "pdfium"
 except ImportError:
-    print("⚠ PyPDF2 not installed. Run: pip install PyPDF2")
-    PDF_SUPPORT = False
+    try:
+        import PyPDF2
+        PDF_BACKEND = "pypdf2"
+    except ImportError:
+        print("⚠ pypdfium2 not installed. Run: pip install pypdfium2")
+        PDF_BACKEND = None
+PDF_SUPPORT = PDF_BACKEND is not None
+
+# Fast JSON serialization (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Concurrent fetching
+try:
+    import aiohttp
+    ASYNC_SUPPORT = True
+except ImportError:
+    print("⚠ aiohttp not installed. Run: pip install aiohttp")
+    ASYNC_SUPPORT = False
 
 # Configuration
 MAIN_URL = "https://www.aasld.org/practice-guidelines"
@@ -37,12 +69,42 @@ RATE_LIMIT_REQUESTS = 1.5
 RATE_LIMIT_SELENIUM = 5.0
 CLOUDFLARE_WAIT = 15
 SELENIUM_TIMEOUT = 30
+SELENIUM_BATCH_SIZE = 4
+CONTENT_SELECTOR = "main, article, div.content"
+
+# Sub-resources Selenium never needs to download (only page_source is used)
+BLOCKED_RESOURCES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css", "*.mp4", "*.webm"
+]
+ASYNC_CONCURRENCY = 16
+ASYNC_LIMIT_PER_HOST = 4
+ASYNC_HOST_INTERVAL = 0.25  # min seconds between request starts on one host
+PDF_WORKERS = os.cpu_count() or 1
+PDF_CHUNK_SIZE = 1 << 16
+CACHE_MAX_AGE_DAYS = 7
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
 }
 
+def make_session() -> requests.Session:
+    """HTTP session with pooled keep-alive connections + retry on transient errors"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+# Shared HTTP session for this process
+SESSION = make_session()
+
 DATA_DIR = Path("data")
 META_DIR = DATA_DIR / "metadata"
 JSON_DIR = DATA_DIR / "json"
@@ -54,18 +116,40 @@ for d in [META_DIR, JSON_DIR, TEXT_DIR, PDF_DIR]:
 
 LINKS_FILE = META_DIR / "second_level_links.txt"
 HEADING_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+BLOCK_TAGS = ["p", "li", "div", "section"]
+CONTENT_TAGS = HEADING_TAGS + BLOCK_TAGS
+CONTENT_TAG_SET = frozenset(CONTENT_TAGS)
+MIN_BLOCK_TEXT = 5       # shorter standalone text is skipped
+MIN_PARAGRAPH_TEXT = 10  # non-heading blocks longer than this go into full_text
+BLOCK_ONLY_TAG_SET = CONTENT_TAG_SET - frozenset(HEADING_TAGS)
 
 REJECT_PATTERNS = [
     "/forums", "/home", "/about", "/contact", "/subscribe",
     "facebook.com", "twitter.com", "linkedin.com", "youtube.com"
 ]
 
+# Precompiled patterns used in per-URL / per-page loops
+_WS_RE = re.compile(r"\s+")
+_SENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+_REJECT_RE = re.compile("|".join(map(re.escape, REJECT_PATTERNS)))
+
+# Hosts that always block plain HTTP clients; more are learned at runtime
+SELENIUM_HOSTS = {"journals.lww.com"}
+_host_failed_requests: set = set()
+
 DRIVER = None
+WRITER = None
+WRITE_QUEUE: queue.Queue = queue.Queue(maxsize=256)
 
 # ============================================================================
 # SELENIUM DRIVER MANAGEMENT
 # ============================================================================
 
+def block_resources(driver):
+    """Block BLOCKED_RESOURCES in the current tab (CDP network state is per tab)"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCES})
+
 def init_selenium_driver():
     """Initialize Selenium driver"""
     global DRIVER
@@ -82,6 +166,9 @@ def init_selenium_driver():
             options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
             options.add_experimental_option("excludeSwitches", ["enable-automation"])
             options.add_experimental_option('useAutomationExtension', False)
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2
+            })
             
             service = Service(ChromeDriverManager().install())
             DRIVER = webdriver.Chrome(service=service, options=options)
@@ -90,6 +177,8 @@ def init_selenium_driver():
             
             DRIVER.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
+            block_resources(DRIVER)
+            
             print("✓ Selenium driver initialized")
         except Exception as e:
             print(f"✗ Failed to initialize driver: {e}")
@@ -115,6 +204,40 @@ def reset_selenium_driver():
     time.sleep(2)
     init_selenium_driver()
 
+# ============================================================================
+# BACKGROUND FILE WRITER
+# ============================================================================
+
+def _writer_loop():
+    """Drain (path, bytes) items from WRITE_QUEUE until a None sentinel arrives"""
+    while True:
+        item = WRITE_QUEUE.get()
+        try:
+            if item is None:
+                return
+            path, data = item
+            path.write_bytes(data)
+        except Exception as e:
+            print(f"    ✗ Write error: {str(e)[:40]}")
+        finally:
+            WRITE_QUEUE.task_done()
+
+def write_file(path: Path, data: bytes):
+    """Queue a file write so the fetch loop never waits on disk"""
+    global WRITER
+    if WRITER is None:
+        WRITER = threading.Thread(target=_writer_loop, name="file-writer", daemon=True)
+        WRITER.start()
+    WRITE_QUEUE.put((path, data))
+
+def close_writer():
+    """Flush queued writes and stop the writer thread"""
+    global WRITER
+    if WRITER:
+        WRITE_QUEUE.put(None)
+        WRITER.join()
+        WRITER = None
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -127,11 +250,40 @@ def clean_url(u: str) -> str:
     return u.split("#")[0].rstrip("/")
 
 def normalize_text(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip().lower()
+    return _WS_RE.sub(" ", s).strip().lower()
 
 def sha256_hash(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
+def is_fresh(path: Path, max_age_days: float) -> bool:
+    """Check if path exists and is newer than max_age_days"""
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return age < max_age_days * 86400
+
+def is_cached(url_hash: str, max_age_days: float) -> bool:
+    """Check if a saved JSON record for url_hash is newer than max_age_days"""
+    return is_fresh(JSON_DIR / f"{url_hash}.json", max_age_days)
+
+def dump_json(obj) -> bytes:
+    """Serialize to indented UTF-8 JSON"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+def dump_json_line(obj) -> bytes:
+    """Serialize to one compact JSON line"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+def record_result(out, record: Dict):
+    """Append one processing result to the open JSONL results file"""
+    out.write(dump_json_line(record))
+    out.flush()
+
 def heading_level(tag_name: Optional[str]) -> int:
     try:
         if tag_name and tag_name.lower().startswith("h") and tag_name[1].isdigit():
@@ -144,38 +296,43 @@ def heading_level(tag_name: Optional[str]) -> int:
 # PDF PROCESSING
 # ============================================================================
 
-def download_pdf(url: str) -> Optional[Path]:
+def download_pdf(url: str, url_hash: str) -> Optional[Path]:
     """Download PDF from URL"""
     try:
         print(f"    → Downloading PDF...")
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        
-        if response.status_code == 200:
-            url_hash = sha256_hash(url)
-            pdf_path = PDF_DIR / f"{url_hash}.pdf"
+        with SESSION.get(url, timeout=30, stream=True) as response:
+            if response.status_code != 200:
+                print(f"    ✗ Failed to download PDF (status: {response.status_code})")
+                return None
             
-            with open(pdf_path, 'wb') as f:
-                f.write(response.content)
+            pdf_path = PDF_DIR / f"{url_hash}.pdf"
+            part_path = pdf_path.with_suffix(".pdf.part")
             
-            print(f"    ✓ PDF downloaded ({len(response.content)} bytes)")
-            return pdf_path
-        else:
-            print(f"    ✗ Failed to download PDF (status: {response.status_code})")
-            return None
+            # Stream to a temp file so an interrupted download never leaves a truncated PDF
+            bytes_written = 0
+            try:
+                with open(part_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=PDF_CHUNK_SIZE):
+                        f.write(chunk)
+                        bytes_written += len(chunk)
+                part_path.replace(pdf_path)
+            except BaseException:
+                part_path.unlink(missing_ok=True)
+                raise
+        
+        print(f"    ✓ PDF downloaded ({bytes_written} bytes)")
+        return pdf_path
             
     except Exception as e:
         print(f"    ✗ Download error: {str(e)[:40]}")
         return None
 
 def parse_pdf_into_paragraphs(full_text: str) -> List[str]:
-    """Split PDF text into paragraphs"""
+    """Split whitespace-normalized PDF text into paragraphs"""
     paragraphs = []
     
-    # Clean the text
-    text = re.sub(r'\s+', ' ', full_text)
-    
     # Split by sentence endings followed by capital letters
-    sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
+    sentences = _SENT_SPLIT_RE.split(full_text)
     
     current_para = []
     for sentence in sentences:
@@ -194,49 +351,79 @@ def parse_pdf_into_paragraphs(full_text: str) -> List[str]:
     
     return paragraphs
 
+def read_pdf_pages_pdfium(pdf_path: Path) -> tuple:
+    """Read page texts with PDFium"""
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        page_count = len(pdf)
+        text_pages = []
+        for page_num in range(page_count):
+            try:
+                page = pdf[page_num]
+                textpage = page.get_textpage()
+                text = _WS_RE.sub(' ', textpage.get_text_range()).strip()
+                textpage.close()
+                page.close()
+                if text:
+                    text_pages.append(text)
+            except Exception:
+                print(f"    ⚠ Error on page {page_num + 1}")
+                continue
+        return page_count, text_pages
+    finally:
+        pdf.close()
+
+def read_pdf_pages_pypdf2(pdf_path: Path) -> tuple:
+    """Read page texts with PyPDF2"""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        
+        text_pages = []
+        for page_num in range(page_count):
+            try:
+                page = pdf_reader.pages[page_num]
+                text = _WS_RE.sub(' ', page.extract_text() or '').strip()
+                if text:
+                    text_pages.append(text)
+            except Exception:
+                print(f"    ⚠ Error on page {page_num + 1}")
+                continue
+        return page_count, text_pages
+
 def extract_text_from_pdf(pdf_path: Path) -> Dict:
     """Extract text from PDF"""
     if not PDF_SUPPORT:
         return {
             "full_text": "",
             "page_count": 0,
-            "error": "PyPDF2 not installed"
+            "error": "No PDF library installed"
         }
     
     try:
         print(f"    → Extracting text from PDF...")
         
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            page_count = len(pdf_reader.pages)
-            
-            text_pages = []
-            for page_num in range(page_count):
-                try:
-                    page = pdf_reader.pages[page_num]
-                    text = page.extract_text()
-                    if text:
-                        text_pages.append(text)
-                except Exception as e:
-                    print(f"    ⚠ Error on page {page_num + 1}")
-                    continue
-            
-            full_text = "\n\n".join(text_pages)
-            full_text_clean = re.sub(r'\s+', ' ', full_text)
-            
-            paragraphs = parse_pdf_into_paragraphs(full_text_clean)
-            
-            print(f"    ✓ Extracted {len(full_text_clean)} characters, {len(paragraphs)} paragraphs")
-            
-            return {
-                "full_text": full_text_clean,
-                "page_count": page_count,
-                "word_count": len(full_text_clean.split()),
-                "char_count": len(full_text_clean),
-                "paragraphs": paragraphs,
-                "paragraph_count": len(paragraphs)
-            }
-            
+        if PDF_BACKEND == "pdfium":
+            page_count, text_pages = read_pdf_pages_pdfium(pdf_path)
+        else:
+            page_count, text_pages = read_pdf_pages_pypdf2(pdf_path)
+        
+        # Pages are already whitespace-normalized, so a plain join is final
+        full_text = " ".join(text_pages)
+        
+        paragraphs = parse_pdf_into_paragraphs(full_text)
+        
+        print(f"    ✓ Extracted {len(full_text)} characters, {len(paragraphs)} paragraphs")
+        
+        return {
+            "full_text": full_text,
+            "page_count": page_count,
+            "word_count": len(full_text.split()),
+            "char_count": len(full_text),
+            "paragraphs": paragraphs,
+            "paragraph_count": len(paragraphs)
+        }
+        
     except Exception as e:
         print(f"    ✗ PDF extraction error: {str(e)[:40]}")
         return {
@@ -245,9 +432,27 @@ def extract_text_from_pdf(pdf_path: Path) -> Dict:
             "error": str(e)
         }
 
-def process_pdf(url: str) -> Optional[Dict]:
+def init_pdf_worker():
+    """Give a forked PDF worker its own session instead of the parent's pooled sockets"""
+    global SESSION
+    SESSION = make_session()
+
+def process_pdf_job(url: str, url_hash: str, force: bool = False,
+                    max_age_days: float = CACHE_MAX_AGE_DAYS) -> tuple:
+    """Run process_pdf in a worker, returning its result and captured progress output"""
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        pdf_data = process_pdf(url, url_hash, force, max_age_days)
+    return pdf_data, log.getvalue()
+
+def process_pdf(url: str, url_hash: str, force: bool = False,
+                max_age_days: float = CACHE_MAX_AGE_DAYS) -> Optional[Dict]:
     """Download and process PDF"""
-    pdf_path = download_pdf(url)
+    pdf_path = PDF_DIR / f"{url_hash}.pdf"
+    if force or not is_fresh(pdf_path, max_age_days):
+        pdf_path = download_pdf(url, url_hash)
+    else:
+        print(f"    → Reusing downloaded PDF")
     
     if not pdf_path:
         return None
@@ -271,10 +476,8 @@ def process_pdf(url: str) -> Optional[Dict]:
         "pdf_path": str(pdf_path)
     }
 
-def save_pdf_data(url: str, extracted_data: Dict) -> tuple:
+def save_pdf_data(url: str, url_hash: str, extracted_data: Dict) -> tuple:
     """Save PDF data to JSON"""
-    url_hash = sha256_hash(url)
-    
     json_record = {
         "page_url": url,
         "page_title": extracted_data["title"],
@@ -293,10 +496,10 @@ def save_pdf_data(url: str, extracted_data: Dict) -> tuple:
     }
     
     json_file = JSON_DIR / f"{url_hash}.json"
-    json_file.write_text(json.dumps(json_record, indent=2, ensure_ascii=False), encoding="utf-8")
+    write_file(json_file, dump_json(json_record))
     
     text_file = TEXT_DIR / f"{url_hash}.txt"
-    text_file.write_text(extracted_data["full_text"], encoding="utf-8")
+    write_file(text_file, extracted_data["full_text"].encode("utf-8"))
     
     return json_file, text_file
 
@@ -304,7 +507,7 @@ def save_pdf_data(url: str, extracted_data: Dict) -> tuple:
 # FETCH FUNCTIONS
 # ============================================================================
 
-def fetch_with_selenium(url: str, retry_count: int = 0) -> Optional[str]:
+def fetch_with_selenium(url: str) -> Optional[str]:
     """Fetch URL using Selenium"""
     try:
         driver = init_selenium_driver()
@@ -313,65 +516,169 @@ def fetch_with_selenium(url: str, retry_count: int = 0) -> Optional[str]:
         print(f"    → Loading with Selenium...")
         driver.get(url)
         
-        time.sleep(3)
+        # The page is loaded once; a retry only keeps polling the same tab
+        for attempt in range(2):
+            if wait_for_page(driver):
+                return driver.page_source
+            if attempt == 0:
+                print(f"    ⚠ Cloudflare still blocking, waiting again...")
         
-        if is_cloudflare_challenge(driver.page_source):
-            print(f"    → Cloudflare detected, waiting {CLOUDFLARE_WAIT}s...")
-            time.sleep(CLOUDFLARE_WAIT)
-            
-            if is_cloudflare_challenge(driver.page_source):
-                print(f"    ⚠ Cloudflare still blocking...")
-                
-                if retry_count < 1:
-                    print(f"    → Retrying...")
-                    time.sleep(10)
-                    return fetch_with_selenium(url, retry_count + 1)
-                else:
-                    return None
-        
-        try:
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-        except:
-            pass
-        
-        html = driver.page_source
-        
-        if is_cloudflare_challenge(html):
-            print(f"    ✗ Cloudflare blocking persists")
-            return None
-        
-        return html
+        print(f"    ✗ Cloudflare blocking persists")
+        return None
         
     except Exception as e:
         print(f"    ✗ Selenium error: {str(e)[:60]}")
         reset_selenium_driver()
         return None
 
+def wait_for_page(driver, timeout: float = CLOUDFLARE_WAIT) -> bool:
+    """Wait until any Cloudflare challenge clears and page content is present"""
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: not is_cloudflare_challenge(d.page_source)
+        )
+    except TimeoutException:
+        return False
+    
+    try:
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, CONTENT_SELECTOR))
+        )
+    except TimeoutException:
+        pass
+    
+    return True
+
+def fetch_many_with_selenium(urls: List[str]) -> Dict[str, Optional[str]]:
+    """Fetch URLs with Selenium, loading them in batches of browser tabs"""
+    pages = {}
+    
+    try:
+        driver = init_selenium_driver()
+        main_handle = driver.current_window_handle
+        
+        for start in range(0, len(urls), SELENIUM_BATCH_SIZE):
+            batch = urls[start:start + SELENIUM_BATCH_SIZE]
+            time.sleep(RATE_LIMIT_SELENIUM)
+            
+            tabs = []
+            for url in batch:
+                print(f"  → Selenium: {url[:60]}...")
+                before = set(driver.window_handles)
+                driver.execute_script("window.open('about:blank');")
+                new_handles = set(driver.window_handles) - before
+                handle = new_handles.pop() if new_handles else None
+                if handle is not None:
+                    # Block resources before navigating; the JS navigation doesn't wait for the load
+                    driver.switch_to.window(handle)
+                    block_resources(driver)
+                    driver.execute_script("window.location.href = arguments[0];", url)
+                tabs.append((url, handle))
+            
+            # Tabs load in parallel; by the time later ones are checked they are usually ready
+            for url, handle in tabs:
+                if handle is None:
+                    continue
+                driver.switch_to.window(handle)
+                if wait_for_page(driver):
+                    pages[url] = driver.page_source
+                driver.close()
+            
+            driver.switch_to.window(main_handle)
+    
+    except Exception as e:
+        print(f"    ✗ Selenium error: {str(e)[:60]}")
+        reset_selenium_driver()
+    
+    # Anything still missing gets the single-tab path with its retry
+    for url in urls:
+        if pages.get(url) is None:
+            print(f"  → Selenium retry: {url[:60]}...")
+            pages[url] = fetch_with_selenium(url)
+    
+    return pages
+
 def fetch_with_requests(url: str) -> Optional[str]:
     """Fetch URL using requests"""
     try:
         time.sleep(RATE_LIMIT_REQUESTS)
-        session = requests.Session()
-        session.headers.update(HEADERS)
-        resp = session.get(url, timeout=30, allow_redirects=True)
-        return resp.text if resp.status_code == 200 else None
+        # Closing the response returns its connection to the pool even when the body is skipped
+        with SESSION.get(url, timeout=30, allow_redirects=True, stream=True) as resp:
+            return resp.text if resp.status_code == 200 else None
     except Exception:
         return None
 
+def needs_selenium(url: str) -> bool:
+    """Check if URL's host is known to block plain HTTP clients"""
+    host = urlparse(url).netloc
+    return host in SELENIUM_HOSTS or host in _host_failed_requests
+
 def fetch(url: str, force_selenium: bool = False) -> Optional[str]:
     """Fetch URL with appropriate method"""
-    if "journals.lww.com" in url or force_selenium:
+    if force_selenium or needs_selenium(url):
         return fetch_with_selenium(url)
     
     html = fetch_with_requests(url)
     if html and not is_cloudflare_challenge(html):
         return html
     
+    if html:
+        _host_failed_requests.add(urlparse(url).netloc)
     print("    → Selenium fallback...")
     return fetch_with_selenium(url)
 
+_host_next_slot: Dict[str, float] = {}
+
+async def wait_for_host_slot(host: str):
+    """Space out request starts on the same host (per-host politeness)"""
+    now = asyncio.get_running_loop().time()
+    slot = max(now, _host_next_slot.get(host, now))
+    _host_next_slot[host] = slot + ASYNC_HOST_INTERVAL
+    await asyncio.sleep(slot - now)
+
+async def fetch_with_aiohttp(session, url: str, sem: asyncio.Semaphore) -> Optional[str]:
+    """Fetch URL using aiohttp"""
+    async with sem:
+        await wait_for_host_slot(urlparse(url).netloc)
+        try:
+            async with session.get(url, allow_redirects=True) as resp:
+                return await resp.text() if resp.status == 200 else None
+        except Exception:
+            return None
+
+async def fetch_all_async(urls: List[str]) -> Dict[str, Optional[str]]:
+    """Fetch URLs concurrently over one aiohttp session"""
+    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit_per_host=ASYNC_LIMIT_PER_HOST, limit=32)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS, timeout=timeout) as session:
+        pages = await asyncio.gather(*[fetch_with_aiohttp(session, url, sem) for url in urls])
+    return dict(zip(urls, pages))
+
+def fetch_all(urls: List[str]) -> Dict[str, Optional[str]]:
+    """Fetch many URLs concurrently, with Selenium fallback on a single thread"""
+    if not ASYNC_SUPPORT:
+        return {url: fetch(url) for url in urls}
+    
+    direct_urls = [u for u in urls if not needs_selenium(u)]
+    print(f"  → Fetching {len(direct_urls)} page(s) concurrently...")
+    pages = asyncio.run(fetch_all_async(direct_urls))
+    
+    selenium_urls = []
+    for url in urls:
+        html = pages.get(url)
+        if html and not is_cloudflare_challenge(html):
+            continue
+        if html:
+            _host_failed_requests.add(urlparse(url).netloc)
+        selenium_urls.append(url)
+    
+    if selenium_urls:
+        pages.update(fetch_many_with_selenium(selenium_urls))
+    
+    print()
+    return pages
+
 # ============================================================================
 # LINK EXTRACTION
 # ============================================================================
@@ -384,7 +691,7 @@ def get_disease_links() -> List[str]:
         print("✗ Failed to fetch main page")
         return []
     
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     disease_section = soup.find(
         lambda tag: tag.name in ["h2", "h3"] and 
         "guidelines and guidance by disease" in normalize_text(tag.get_text())
@@ -395,6 +702,7 @@ def get_disease_links() -> List[str]:
         return []
     
     links = []
+    seen = {clean_url(MAIN_URL)}
     for sibling in disease_section.find_next_siblings():
         if sibling.name in ["h1", "h2", "h3"]:
             break
@@ -402,49 +710,37 @@ def get_disease_links() -> List[str]:
             href = a.get("href")
             if href and "/practice-guidelines/" in href:
                 full_url = clean_url(urljoin(MAIN_URL, href))
-                if full_url not in links and full_url != clean_url(MAIN_URL):
+                if full_url not in seen:
+                    seen.add(full_url)
                     links.append(full_url)
     
     print(f"  ✓ Found {len(links)} disease pages\n")
     return links
 
-def match_target_heading(txt: str) -> bool:
-    """Check if heading matches target patterns"""
-    t = normalize_text(txt)
-    return (
-        ("practice" in t and "guid" in t) or
-        ("supplement" in t and "material" in t)
-    )
+def _lower(expr: str) -> str:
+    return f"translate({expr}, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
 
-def extract_section_using_next_elements(heading: Tag) -> BeautifulSoup:
-    """Extract content section after a heading"""
-    parts = []
-    cur_level = heading_level(heading.name)
-    started = False
-    
-    for el in heading.next_elements:
-        if not started:
-            if el is heading:
-                continue
-            started = True
-        
-        if isinstance(el, Tag) and el.name in HEADING_TAGS:
-            if heading_level(el.name) <= cur_level:
-                break
-        
-        if isinstance(el, (Tag, NavigableString)):
-            if isinstance(el, Tag) and el.name in ["script", "style", "noscript"]:
-                continue
-            parts.append(str(el))
-    
-    return BeautifulSoup("".join(parts), "html.parser")
+_ANY_HEADING = " or ".join(f"self::{h}" for h in HEADING_TAGS)
+_HEADING_TEXT = _lower("normalize-space(.)")
+
+# Headings mentioning practice guidelines or supplementary material
+TARGET_HEADING_XPATH = etree.XPath(
+    f"//*[{_ANY_HEADING}]"
+    f"[(contains({_HEADING_TEXT}, 'practice') and contains({_HEADING_TEXT}, 'guid'))"
+    f" or (contains({_HEADING_TEXT}, 'supplement') and contains({_HEADING_TEXT}, 'material'))]"
+)
+
+# Links inside or after a heading, plus the later headings that end its section
+SECTION_ITEMS_XPATH = etree.XPath(
+    f"descendant::a[@href] | following::*[{_ANY_HEADING} or self::a[@href]]"
+)
 
 def is_valid_content_link(url: str, base_url: str) -> bool:
     """Check if URL is a valid guideline link"""
     if not url or url == base_url:
         return False
     
-    if any(pattern in url.lower() for pattern in REJECT_PATTERNS):
+    if _REJECT_RE.search(url.lower()):
         return False
     
     parsed = urlparse(url)
@@ -463,28 +759,38 @@ def is_valid_content_link(url: str, base_url: str) -> bool:
     
     return False
 
-def get_links_under_target_headings(page_url: str) -> List[str]:
-    """Extract guideline links from a disease page"""
-    html = fetch(page_url)
-    if not html:
+def parse_links_under_target_headings(html: str, page_url: str) -> List[str]:
+    """Extract guideline links from already-fetched disease page HTML"""
+    try:
+        tree = lxml.html.fromstring(html)
+    except ValueError:
+        # Unicode input with an XML encoding declaration must be passed as bytes
+        tree = lxml.html.fromstring(html.encode("utf-8"))
+    except etree.ParserError:
         return []
     
-    soup = BeautifulSoup(html, "html.parser")
     collected_links = []
+    seen = set()
     
-    for heading in soup.find_all(HEADING_TAGS):
-        if match_target_heading(heading.get_text(strip=True)):
-            section = extract_section_using_next_elements(heading)
+    for heading in TARGET_HEADING_XPATH(tree):
+        cur_level = heading_level(heading.tag)
+        
+        # Items come back in document order; the section ends at the next same-or-higher heading
+        for el in SECTION_ITEMS_XPATH(heading):
+            if el.tag in HEADING_TAGS:
+                if heading_level(el.tag) <= cur_level:
+                    break
+                continue
             
-            for a in section.find_all("a", href=True):
-                href = a.get("href")
-                if not href or href.startswith("#"):
-                    continue
-                
-                full_url = clean_url(urljoin(page_url, href))
-                
-                if is_valid_content_link(full_url, page_url) and full_url not in collected_links:
-                    collected_links.append(full_url)
+            href = el.get("href")
+            if not href or href.startswith("#"):
+                continue
+            
+            full_url = clean_url(urljoin(page_url, href))
+            
+            if full_url not in seen and is_valid_content_link(full_url, page_url):
+                seen.add(full_url)
+                collected_links.append(full_url)
     
     return collected_links
 
@@ -492,22 +798,56 @@ def get_links_under_target_headings(page_url: str) -> List[str]:
 # HTML DATA EXTRACTION
 # ============================================================================
 
+def is_paragraph_block(name: str, full_len: int) -> bool:
+    """Non-heading blocks whose whole text is long enough get their own full_text paragraph"""
+    return name in BLOCK_ONLY_TAG_SET and full_len > MIN_PARAGRAPH_TEXT
+
+def own_text_parts(element: Tag, memo: Dict[int, tuple]) -> tuple:
+    """(text of element minus its paragraph-block descendants, length of all its text)"""
+    key = id(element)
+    if key in memo:
+        return memo[key]
+    
+    parts = []
+    full_len = 0
+    for child in element.children:
+        if isinstance(child, Tag):
+            child_parts, child_len = own_text_parts(child, memo)
+            full_len += child_len
+            # Headings and short blocks never become paragraphs, so they stay with their container
+            if not is_paragraph_block(child.name, child_len):
+                parts.extend(child_parts)
+        elif type(child) in (NavigableString, CData):
+            text = child.strip()
+            if text:
+                parts.append(text)
+                full_len += len(text)
+    
+    memo[key] = (parts, full_len)
+    return parts, full_len
+
 def extract_all_text_with_structure(html: str) -> Dict:
     """Extract ALL text with structure preserved"""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     
     for tag in soup(["script", "style", "noscript"]):
         tag.decompose()
     
     sections = []
     current_section = None
+    all_paragraphs = []
     
-    for element in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'div', 'section']):
-        if element.find_parent(['script', 'style']):
-            continue
+    # Single pass in document order; each block emits only the text its paragraph
+    # descendants don't, so nested containers keep their own text without repeats
+    memo = {}
+    for element in soup.find_all(CONTENT_TAGS):
+        is_heading = element.name in HEADING_TAGS
         
-        text = element.get_text(strip=True)
-        if not text or len(text) < 5:
+        parts, full_len = own_text_parts(element, memo)
+        text = " ".join(parts)
+        # A paragraph block keeps even a short remainder, since no container holds it
+        is_paragraph = bool(text) and is_paragraph_block(element.name, full_len)
+        if not is_paragraph and len(text) < MIN_BLOCK_TEXT:
             continue
         
         if element.name in ['h1', 'h2', 'h3']:
@@ -518,23 +858,25 @@ def extract_all_text_with_structure(html: str) -> Dict:
                 'level': int(element.name[1]),
                 'content': []
             }
-        elif current_section:
-            current_section['content'].append(text)
+            continue
+        
+        # Text folded into an enclosing block is already in that block's text
+        if is_paragraph or element.find_parent(CONTENT_TAGS) is None:
+            if current_section:
+                current_section['content'].append(text)
+        
+        if is_paragraph:
+            all_paragraphs.append(text)
     
     if current_section:
         sections.append(current_section)
     
-    all_paragraphs = []
-    for p in soup.find_all(['p', 'li', 'div']):
-        text = p.get_text(strip=True)
-        if text and len(text) > 10:
-            all_paragraphs.append(text)
-    
-    tables = extract_all_tables(html)
+    tables = extract_all_tables(soup)
     
     title = soup.title.string if soup.title else "No title"
-    if soup.find("h1"):
-        title = soup.find("h1").get_text(strip=True)
+    h1 = soup.find("h1")
+    if h1:
+        title = h1.get_text(strip=True)
     
     links = []
     for a in soup.find_all('a', href=True):
@@ -560,9 +902,12 @@ def extract_all_text_with_structure(html: str) -> Dict:
         "char_count": len(full_text)
     }
 
-def extract_all_tables(html: str) -> List[Dict]:
-    """Extract ALL tables"""
-    soup = BeautifulSoup(html, "html.parser")
+def row_cells(tr: Tag) -> List[str]:
+    """Text of a row's cells (cells are direct children, so don't search inside them)"""
+    return [td.get_text(strip=True) for td in tr.find_all(['td', 'th'], recursive=False)]
+
+def extract_all_tables(soup: BeautifulSoup) -> List[Dict]:
+    """Extract ALL tables from an already-parsed page"""
     tables = []
     
     for table_idx, table in enumerate(soup.find_all("table")):
@@ -572,17 +917,18 @@ def extract_all_tables(html: str) -> List[Dict]:
         thead = table.find('thead')
         if thead:
             for tr in thead.find_all('tr'):
-                header_cells = [td.get_text(strip=True) for td in tr.find_all(['th', 'td'])]
+                header_cells = row_cells(tr)
                 if header_cells:
                     headers = header_cells
                     break
         
         tbody = table.find('tbody')
         table_body = tbody if tbody else table
+        header_key = tuple(headers)
         
         for tr in table_body.find_all('tr'):
-            cells = [td.get_text(strip=True) for td in tr.find_all(['td', 'th'])]
-            if cells and cells != headers:
+            cells = row_cells(tr)
+            if cells and tuple(cells) != header_key:
                 rows.append(cells)
         
         if rows or headers:
@@ -596,10 +942,8 @@ def extract_all_tables(html: str) -> List[Dict]:
     
     return tables
 
-def save_complete_data(url: str, extracted_data: Dict) -> tuple:
+def save_complete_data(url: str, url_hash: str, extracted_data: Dict) -> tuple:
     """Save all extracted data"""
-    url_hash = sha256_hash(url)
-    
     json_record = {
         "page_url": url,
         "page_title": extracted_data["title"],
@@ -620,17 +964,17 @@ def save_complete_data(url: str, extracted_data: Dict) -> tuple:
     }
     
     json_file = JSON_DIR / f"{url_hash}.json"
-    json_file.write_text(json.dumps(json_record, indent=2, ensure_ascii=False), encoding="utf-8")
+    write_file(json_file, dump_json(json_record))
     
     text_file = TEXT_DIR / f"{url_hash}.txt"
-    text_file.write_text(extracted_data["full_text"], encoding="utf-8")
+    write_file(text_file, extracted_data["full_text"].encode("utf-8"))
     
     sections_file = TEXT_DIR / f"{url_hash}_sections.json"
-    sections_file.write_text(json.dumps(extracted_data["sections"], indent=2, ensure_ascii=False), encoding="utf-8")
+    write_file(sections_file, dump_json(extracted_data["sections"]))
     
     if extracted_data["tables"]:
         tables_file = TEXT_DIR / f"{url_hash}_tables.json"
-        tables_file.write_text(json.dumps(extracted_data["tables"], indent=2, ensure_ascii=False), encoding="utf-8")
+        write_file(tables_file, dump_json(extracted_data["tables"]))
     
     return json_file, text_file
 
@@ -638,14 +982,27 @@ def save_complete_data(url: str, extracted_data: Dict) -> tuple:
 # MAIN EXECUTION
 # ============================================================================
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="AASLD practice guidelines scraper")
+    parser.add_argument("--force", action="store_true",
+                        help="re-fetch every URL even if saved output exists")
+    parser.add_argument("--max-age-days", type=float, default=CACHE_MAX_AGE_DAYS,
+                        help=f"reuse saved output newer than this (default: {CACHE_MAX_AGE_DAYS})")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     print("\n" + "="*70)
     print("AASLD Complete Workflow: HTML + PDF Processing")
     print("="*70 + "\n")
     
     if not PDF_SUPPORT:
-        print("⚠ Warning: PyPDF2 not installed - PDFs will be skipped")
-        print("  Install with: pip install PyPDF2\n")
+        print("⚠ Warning: pypdfium2 not installed - PDFs will be skipped")
+        print("  Install with: pip install pypdfium2\n")
+    
+    pdf_pool = None
+    results_out = None
     
     try:
         # STEP 1 & 2: Extract all links
@@ -658,10 +1015,12 @@ def main():
         
         print("== STEP 2: Extracting guideline links from disease pages ==\n")
         all_links = []
+        disease_html = fetch_all(disease_pages)
         for i, page_url in enumerate(disease_pages, 1):
             disease_name = page_url.split('/')[-1]
             print(f"[{i}/{len(disease_pages)}] {disease_name}")
-            links = get_links_under_target_headings(page_url)
+            html = disease_html.get(page_url)
+            links = parse_links_under_target_headings(html, page_url) if html else []
             if links:
                 all_links.extend(links)
                 print(f"  ✓ {len(links)} link(s)\n")
@@ -681,29 +1040,69 @@ def main():
             "blocked": 0,
             "pdf_success": 0,
             "pdf_failed": 0,
-            "insufficient": 0
+            "insufficient": 0,
+            "cached": 0
         }
         
-        results = []
+        # One JSON line per URL, appended as we go so a crashed run keeps its results
+        results_file = META_DIR / "processing_results.jsonl"
+        results_out = open(results_file, "ab")
+        
+        # Each URL's hash is its storage key; compute it once and pass it around
+        url_hashes = {url: sha256_hash(url) for url in unique_links}
+        
+        # URLs saved by a recent run are skipped unless --force is given
+        cached = set() if args.force else {
+            u for u in unique_links if is_cached(url_hashes[u], args.max_age_days)
+        }
+        pending = [u for u in unique_links if u not in cached]
+        
+        # PDFs are downloaded and parsed in worker processes while HTML is fetched
+        pdf_futures = {}
+        if PDF_SUPPORT:
+            pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, initializer=init_pdf_worker)
+            for url in pending:
+                if url.endswith(".pdf"):
+                    pdf_futures[url] = pdf_pool.submit(
+                        process_pdf_job, url, url_hashes[url], args.force, args.max_age_days
+                    )
+        
+        html_pages = fetch_all([u for u in pending if not u.endswith(".pdf")])
         
         for i, url in enumerate(unique_links, 1):
             print(f"[{i}/{len(unique_links)}] {url[:60]}...")
             
+            if url in cached:
+                print(f"    ✓ Cached, skipping\n")
+                stats["cached"] += 1
+                record_result(results_out, {
+                    "url": url,
+                    "status": "cached",
+                    "type": "pdf" if url.endswith(".pdf") else "html"
+                })
+                continue
+            
             # Handle PDFs
             if url.endswith(".pdf"):
                 if not PDF_SUPPORT:
-                    print(f"    ✗ PDF skipped (PyPDF2 not installed)\n")
+                    print(f"    ✗ PDF skipped (pypdfium2 not installed)\n")
                     stats["pdf_failed"] += 1
                     continue
                 
-                pdf_data = process_pdf(url)
+                try:
+                    # Worker output is printed here so it stays under this URL's line
+                    pdf_data, pdf_log = pdf_futures[url].result()
+                    print(pdf_log, end="")
+                except Exception as e:
+                    print(f"    ✗ PDF worker error: {str(e)[:40]}")
+                    pdf_data = None
                 
                 if pdf_data:
-                    json_file, text_file = save_pdf_data(url, pdf_data)
+                    json_file, text_file = save_pdf_data(url, url_hashes[url], pdf_data)
                     print(f"    ✓ PDF Success - {pdf_data['word_count']:,} words\n")
                     stats["pdf_success"] += 1
                     stats["success"] += 1
-                    results.append({
+                    record_result(results_out, {
                         "url": url,
                         "status": "success",
                         "type": "pdf",
@@ -714,23 +1113,23 @@ def main():
                     print(f"    ✗ PDF processing failed\n")
                     stats["pdf_failed"] += 1
                     stats["failed"] += 1
-                    results.append({"url": url, "status": "failed", "type": "pdf"})
+                    record_result(results_out, {"url": url, "status": "failed", "type": "pdf"})
                 
                 continue
             
             # Handle HTML pages
-            html = fetch(url)
+            html = html_pages.get(url)
             
             if not html:
                 print(f"    ✗ Failed to fetch\n")
                 stats["failed"] += 1
-                results.append({"url": url, "status": "failed", "type": "html"})
+                record_result(results_out, {"url": url, "status": "failed", "type": "html"})
                 continue
             
             if is_cloudflare_challenge(html):
                 print(f"    ✗ Blocked by Cloudflare\n")
                 stats["blocked"] += 1
-                results.append({"url": url, "status": "blocked", "type": "html"})
+                record_result(results_out, {"url": url, "status": "blocked", "type": "html"})
                 continue
             
             try:
@@ -739,14 +1138,14 @@ def main():
                 if not extracted_data["full_text"] or len(extracted_data["full_text"]) < 100:
                     print(f"    ✗ Insufficient content\n")
                     stats["insufficient"] += 1
-                    results.append({"url": url, "status": "insufficient", "type": "html"})
+                    record_result(results_out, {"url": url, "status": "insufficient", "type": "html"})
                     continue
                 
-                json_file, text_file = save_complete_data(url, extracted_data)
+                json_file, text_file = save_complete_data(url, url_hashes[url], extracted_data)
                 
                 print(f"    ✓ HTML Success - {extracted_data['word_count']:,} words, {extracted_data['section_count']} sections\n")
                 stats["success"] += 1
-                results.append({
+                record_result(results_out, {
                     "url": url,
                     "status": "success",
                     "type": "html",
@@ -758,12 +1157,9 @@ def main():
             except Exception as e:
                 print(f"    ✗ Error: {str(e)[:40]}\n")
                 stats["failed"] += 1
-                results.append({"url": url, "status": "error", "type": "html"})
+                record_result(results_out, {"url": url, "status": "error", "type": "html"})
         
         # SUMMARY
-        results_file = META_DIR / "processing_results.json"
-        results_file.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
-        
         print("\n" + "="*70)
         print("PROCESSING SUMMARY")
         print("="*70)
@@ -775,7 +1171,13 @@ def main():
         print(f"  - PDF Failed: {stats['pdf_failed']}")
         print(f"⊘ Blocked: {stats['blocked']}")
         print(f"⊘ Insufficient: {stats['insufficient']}")
-        print(f"\nSuccess rate: {(stats['success'] / stats['total'] * 100):.1f}%")
+        print(f"↺ Cached: {stats['cached']}")
+        # Cached URLs weren't processed this run, so they don't count either way
+        processed = stats['total'] - stats['cached']
+        if processed:
+            print(f"\nSuccess rate: {(stats['success'] / processed * 100):.1f}%")
+        else:
+            print(f"\nSuccess rate: n/a (all links cached)")
         print("="*70)
         print(f"\nData saved to:")
         print(f"  - Metadata JSON: {JSON_DIR}")
@@ -785,6 +1187,11 @@ def main():
         print("="*70 + "\n")
         
     finally:
+        if pdf_pool:
+            pdf_pool.shutdown(cancel_futures=True)
+        if results_out:
+            results_out.close()
+        close_writer()
         close_selenium_driver()
 
 if __name__ == "__main__":
@@ -9,13 +9,243 @@ Prepares data for RAG indexing by:
 - Preparing chunks for indexing
 """
 
+import argparse
+import hashlib
 import json
+import mmap
 import os
 import re
+import sys
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+from itertools import repeat
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 
+# Fast JSON parsing/serialization (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Progress bar (falls back to per-file prints)
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Aho-Corasick automaton for literal boilerplate (falls back to regex)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Linear-time (RE2) engine for the extraction scanners (falls back to re).
+# Scanner patterns use inline flags so they compile under either engine.
+try:
+    import re2
+except ImportError:
+    re2 = None
+_scan_re = re2 or re
+
+# re's \s and \d are Unicode-aware but RE2's are ASCII-only, so under RE2 the
+# scanners spell out the same classes: _S is usable bare in [...] or as [_S].
+if re2:
+    # Every str.isspace() character is below U+3001
+    _S = ''.join(c for c in map(chr, range(0x3001)) if c.isspace())
+    _D = r'\p{Nd}'
+else:
+    _S, _D = r'\s', r'\d'
+
+# Columnar Parquet output (only needed for --output-format parquet)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+OUTPUT_FORMATS = ('per-file', 'ndjson', 'parquet')
+
+# Files at least this large are parsed from an mmap instead of a bytes copy
+MMAP_MIN_SIZE = 1 << 20
+
+# camelCase, sentence-spacing and punctuation fixes as one pass;
+# _normalize_sub picks the replacement from whichever group matched
+_NORMALIZE_RE = re.compile(
+    r'(?P<cam>[a-z](?=[A-Z]))'    # camelCase -> camel Case
+    r'|(?P<sent>[.!?](?=[A-Z]))'  # end.Next -> end. Next
+    r'|(?P<dots>\.{3,})'          # excessive dots -> ...
+    r'|(?P<dash>-{3,})'           # excessive dashes -> ---
+)
+
+
+def _normalize_sub(match: re.Match) -> str:
+    kind = match.lastgroup
+    if kind == 'dots':
+        # A dot run ending a sentence still gets the sentence space
+        end, text = match.end(), match.string
+        return '... ' if end < len(text) and 'A' <= text[end] <= 'Z' else '...'
+    if kind == 'dash':
+        return '---'
+    return match.group() + ' '
+
+
+def _as_text(value: Any) -> str:
+    """Coerce a JSON value to str, passing strings straight through"""
+    return value if type(value) is str else str(value)
+
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace runs to single spaces, then apply _NORMALIZE_RE"""
+    # split/join collapses whitespace in C, leaving far fewer regex matches
+    return _NORMALIZE_RE.sub(_normalize_sub, ' '.join(text.split()))
+
+
+# Precompiled extraction patterns used by _scan_all.
+# A recommendation block is a header up to the next end marker (or end of text).
+_REC_HEADER_RE = _scan_re.compile(rf'(?i)Recommendation[{_S}]+({_D}+)[:{_S}]+')
+_REC_END_RE = _scan_re.compile(rf'(?i)Recommendation[{_S}]+{_D}+|Case[{_S}]+{_D}+|Summary')
+_GRADE_RE = _scan_re.compile(rf'\((Strong|Conditional|Weak)[{_S}]+recommendation[^)]+\)')
+_CERTAINTY_RE = _scan_re.compile(rf'(?i)\((?:high|moderate|low|very low)[{_S}]+certainty\)')
+# The clinical-value patterns wrap the whole match in group 1 so findall
+# returns (value, number, unit, ...) tuples without building match objects.
+_DOSAGE_RE = _scan_re.compile(
+    rf'(?i)(({_D}+(?:\.{_D}+)?)[{_S}]*(mg|mcg|IU/mL|U/L|IU|mL|kg)[{_S}]*(?:orally|subcutaneously|daily|weekly|monthly)?)'
+)
+_THRESHOLD_RE = _scan_re.compile(
+    rf'(?i)((≥|≤|<|>|>=|<=)[{_S}]*({_D}+(?:,{_D}+)?)[{_S}]*(IU/mL|U/L|IU|mg/dL|years?|months?|weeks?|days?))'
+)
+
+
+def _find_recommendation_blocks(text: str) -> List[tuple]:
+    """Return (number, body, raw block) for each recommendation block.
+    
+    Same result as finditer over
+    Recommendation\s+(\d+)[:\s]+(.*?)(?=Recommendation\s+\d+|Case\s+\d+|$|Summary)
+    with IGNORECASE|DOTALL, but built from two lookahead-free scans so it runs
+    on RE2 and never re-tests the lookahead at every character of a body.
+    """
+    end_starts = [m.start() for m in _REC_END_RE.finditer(text)]
+    # Where `$` matches: end of text, or just before a final newline
+    text_end = len(text) - 1 if text.endswith('\n') else len(text)
+    
+    blocks = []
+    pos = 0
+    while True:
+        header = _REC_HEADER_RE.search(text, pos)
+        if not header:
+            return blocks
+        
+        body_start = header.end()
+        body_end = text_end if text_end >= body_start else len(text)
+        i = bisect_left(end_starts, body_start)
+        if i < len(end_starts):
+            body_end = min(body_end, end_starts[i])
+        
+        blocks.append((header.group(1), text[body_start:body_end], text[header.start():body_end]))
+        pos = body_end
+
+# Section headings that mark navigation/cookie/branding blocks
+_SKIP_HEADING_RE = re.compile(r'logo|navigation|cookie|privacy')
+
+# Strings shorter than this (cells, headings, list items) go through the clean_text cache
+CLEAN_CACHE_MAX_LEN = 512
+
+_REGEX_META = set('.^$*+?{}[]|()')
+
+
+@contextmanager
+def json_buffer(path: Path):
+    """Yield a file's bytes, memory-mapping large ones instead of copying them"""
+    if not orjson or path.stat().st_size < MMAP_MIN_SIZE:
+        yield path.read_bytes()
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            yield view
+
+
+def parse_json(buffer) -> Any:
+    """Parse JSON from a json_buffer"""
+    if orjson:
+        return orjson.loads(buffer)
+    return json.loads(buffer)
+
+
+def load_json(path: Path) -> Any:
+    """Read a JSON file, memory-mapping large ones so orjson parses in place"""
+    with json_buffer(path) as buffer:
+        return parse_json(buffer)
+
+
+def save_json(path: Path, obj: Any):
+    """Write obj as indented UTF-8 JSON"""
+    if orjson:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def dump_json_line(obj: Any) -> bytes:
+    """Serialize obj as one compact UTF-8 JSON line"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS) + b'\n'
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _is_literal(pattern: str) -> bool:
+    """True if a pattern has no regex operators once escapes are removed"""
+    return not (_REGEX_META & set(re.sub(r'\\.', '', pattern)))
+
+
+def _unescape(pattern: str) -> str:
+    return re.sub(r'\\(.)', r'\1', pattern)
+
+
+def _nav_key(pattern: str) -> Optional[str]:
+    """Lowercased literal every match of pattern contains (None if there isn't one)"""
+    prefix = pattern.split('.*')[0]
+    return _unescape(prefix).lower() if prefix and _is_literal(prefix) else None
+
+
+def _index_nav_keys(patterns: List[str]) -> tuple:
+    """Map each key to its pattern indices; patterns without a key are always tried"""
+    keys, always = {}, set()
+    for i, pattern in enumerate(patterns):
+        key = _nav_key(pattern)
+        if key:
+            keys.setdefault(key, []).append(i)
+        else:
+            always.add(i)
+    return keys, always
+
+
+def _build_automaton(keys: Dict[str, List[int]]):
+    """Build an automaton mapping each key to the pattern indices it stands for"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for key, indices in keys.items():
+        automaton.add_word(key, indices)
+    automaton.make_automaton()
+    return automaton
+
+
+# The only non-ASCII characters IGNORECASE matches to ASCII letters whose
+# lower() isn't that letter; folded so key lookups never miss a real match
+_NAV_FOLD = (('\u0130', 'i'), ('\u0131', 'i'), ('\u017f', 's'))
+
+
+def _fold_nav(text: str) -> str:
+    if not text.isascii():
+        for char, ascii_char in _NAV_FOLD:
+            text = text.replace(char, ascii_char)
+    return text.lower()
+
 
 class AASLDDataCleaner:
     """Cleans and normalizes AASLD guideline JSON data for RAG indexing"""
@@ -69,6 +299,16 @@ class AASLDDataCleaner:
         r'Most Popular',
     ]
     
+    # Patterns are applied in order, each like its own re.sub, but only when the
+    # literal it requires occurs in the text. One Aho-Corasick scan finds those
+    # keys (substring checks without pyahocorasick).
+    _NAV_RES = [re.compile(p, re.IGNORECASE) for p in NAVIGATION_PATTERNS]
+    _NAV_KEYS, _NAV_ALWAYS = _index_nav_keys(NAVIGATION_PATTERNS)
+    _NAV_AUTOMATON = _build_automaton(_NAV_KEYS)
+    _NAV_KEY_MAX_LEN = max(map(len, _NAV_KEYS))
+    # Text shorter than every pattern can't contain one (the regexes only add '.*')
+    _NAV_MIN_LEN = min(len(_unescape(p.replace('.*', ''))) for p in NAVIGATION_PATTERNS)
+    
     # Patterns for extracting recommendations
     RECOMMENDATION_PATTERNS = [
         r'Recommendation\s+\d+',
@@ -92,96 +332,141 @@ class AASLDDataCleaner:
         r'\d+\s*to\s*\d+',
     ]
     
-    def __init__(self, input_dir: str, output_dir: str = "cleaned_data"):
+    def __init__(self, input_dir: str, output_dir: str = "cleaned_data", output_format: str = "per-file",
+                 force: bool = False):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+        if output_format == 'parquet' and pa is None:
+            raise ImportError("parquet output requires pyarrow (pip install pyarrow)")
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.output_format = output_format
+        self.force = force
         
+    @classmethod
+    def strip_navigation(cls, text: str) -> str:
+        """Remove navigation/boilerplate patterns"""
+        candidates = cls._nav_candidates(text)
+        for i, pattern in enumerate(cls._NAV_RES):
+            if i not in candidates:
+                continue
+            parts, joins, pos, length = [], [], 0, 0
+            for match in pattern.finditer(text):
+                parts.append(text[pos:match.start()])
+                length += match.start() - pos
+                joins.append(length)
+                pos = match.end()
+            if not joins:
+                continue
+            parts.append(text[pos:])
+            text = ''.join(parts)
+            # A removal can join text into a new key for a later pattern;
+            # any such key lies within one key length of a join
+            width = cls._NAV_KEY_MAX_LEN
+            for join in joins:
+                candidates |= cls._nav_candidates(text[max(join - width, 0):join + width])
+        return text
+    
+    @classmethod
+    def _nav_candidates(cls, text: str) -> set:
+        """Indices of navigation patterns that might match text"""
+        haystack = _fold_nav(text)
+        found = set(cls._NAV_ALWAYS)
+        if cls._NAV_AUTOMATON is not None:
+            for _, indices in cls._NAV_AUTOMATON.iter(haystack):
+                found.update(indices)
+        else:
+            for key, indices in cls._NAV_KEYS.items():
+                if key in haystack:
+                    found.update(indices)
+        return found
+    
     def clean_text(self, text: str) -> str:
         """Clean and normalize text content"""
         if not text:
             return ""
         
-        # Remove navigation/boilerplate patterns
-        for pattern in self.NAVIGATION_PATTERNS:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single
-        text = re.sub(r'\n\s*\n+', '\n\n', text)  # Multiple newlines to double
-        text = re.sub(r'[ \t]+', ' ', text)  # Tabs and multiple spaces
+        # Tiny cells and labels that no pattern or fix can touch come back as-is
+        if (len(text) < self._NAV_MIN_LEN and text.isascii() and text.isprintable()
+                and '  ' not in text and text[0] != ' ' != text[-1]
+                and not _NORMALIZE_RE.search(text)):
+            return text
         
-        # Fix common formatting issues
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)  # Add space between camelCase
-        text = re.sub(r'([\.!?])([A-Z])', r'\1 \2', text)  # Space after sentence
+        # Short strings repeat a lot across tables and sections; long ones would only evict them
+        if len(text) < CLEAN_CACHE_MAX_LEN:
+            return _clean_text_cached(text)
+        return self._clean_text_uncached(text)
+    
+    @classmethod
+    def _clean_text_uncached(cls, text: str) -> str:
+        # Remove navigation/boilerplate patterns
+        text = cls.strip_navigation(text)
         
-        # Remove excessive punctuation
-        text = re.sub(r'\.{3,}', '...', text)
-        text = re.sub(r'-{3,}', '---', text)
+        # Normalize whitespace, fix spacing, and cap repeated punctuation
+        text = _normalize(text)
         
         # Clean up copyright and boilerplate at end
-        text = re.sub(r'Copyright.*$', '', text, flags=re.MULTILINE | re.DOTALL)
+        cut = text.find('Copyright')
+        if cut != -1:
+            text = text[:cut]
         
         return text.strip()
     
-    def extract_recommendations(self, text: str) -> List[Dict[str, Any]]:
-        """Extract recommendation statements with grades"""
+    def _scan_all(self, text: str) -> Dict[str, list]:
+        """Run every extraction pattern over the text, grouping matches by kind"""
+        return {
+            'recommendation': _find_recommendation_blocks(text),
+            'dosage': _DOSAGE_RE.findall(text),
+            'threshold': _THRESHOLD_RE.findall(text),
+        }
+    
+    def extract_recommendations(self, text: str, scan: Optional[Dict[str, list]] = None,
+                                keep_raw: bool = False) -> List[Dict[str, Any]]:
+        """Extract recommendation statements with grades (keep_raw adds the matched block for debugging)"""
         recommendations = []
         
         # Find recommendation blocks
-        rec_pattern = r'Recommendation\s+(\d+)[:\s]+(.*?)(?=Recommendation\s+\d+|Case\s+\d+|$|Summary)'
-        matches = re.finditer(rec_pattern, text, re.IGNORECASE | re.DOTALL)
+        blocks = scan['recommendation'] if scan else _find_recommendation_blocks(text)
         
-        for match in matches:
-            rec_num = match.group(1)
-            rec_text = match.group(2).strip()
+        for rec_num, rec_text, raw_text in blocks:
+            # Blocks are slices of already-cleaned full text, so only whitespace needs tidying
+            rec_text = ' '.join(rec_text.split())
             
             # Extract recommendation grade
-            grade_match = re.search(r'\((Strong|Conditional|Weak)\s+recommendation[^)]+\)', rec_text)
-            grade = grade_match.group(1) if grade_match else None
+            grade_match = _GRADE_RE.search(rec_text)
+            grade = sys.intern(grade_match.group(1)) if grade_match else None
             
             # Extract certainty
-            certainty_match = re.search(r'\((?:high|moderate|low|very low)\s+certainty\)', rec_text, re.IGNORECASE)
-            certainty = certainty_match.group(0) if certainty_match else None
-            
-            # Clean recommendation text
-            rec_text = self.clean_text(rec_text)
+            certainty_match = _CERTAINTY_RE.search(rec_text)
+            certainty = sys.intern(certainty_match.group(0)) if certainty_match else None
             
             if rec_text:
-                recommendations.append({
+                recommendation = {
                     'number': rec_num,
                     'text': rec_text,
                     'grade': grade,
-                    'certainty': certainty,
-                    'raw_text': match.group(0)
-                })
+                    'certainty': certainty
+                }
+                if keep_raw:
+                    recommendation['raw_text'] = raw_text
+                recommendations.append(recommendation)
         
         return recommendations
     
-    def extract_clinical_values(self, text: str) -> List[Dict[str, Any]]:
+    def extract_clinical_values(self, text: str, scan: Optional[Dict[str, list]] = None) -> List[Dict[str, Any]]:
         """Extract clinical values (dosages, thresholds, etc.)"""
-        values = []
-        
         # Dosage patterns
-        dosage_pattern = r'(\d+(?:\.\d+)?)\s*(mg|mcg|IU/mL|U/L|IU|mL|kg)\s*(?:orally|subcutaneously|daily|weekly|monthly)?'
-        for match in re.finditer(dosage_pattern, text, re.IGNORECASE):
-            values.append({
-                'type': 'dosage',
-                'value': match.group(0),
-                'number': match.group(1),
-                'unit': match.group(2)
-            })
+        values = [
+            {'type': 'dosage', 'value': value, 'number': number, 'unit': unit}
+            for value, number, unit in (scan['dosage'] if scan else _DOSAGE_RE.findall(text))
+        ]
         
         # Threshold patterns
-        threshold_pattern = r'(≥|≤|<|>|>=|<=)\s*(\d+(?:,\d+)?)\s*(IU/mL|U/L|IU|mg/dL|years?|months?|weeks?|days?)'
-        for match in re.finditer(threshold_pattern, text, re.IGNORECASE):
-            values.append({
-                'type': 'threshold',
-                'value': match.group(0),
-                'operator': match.group(1),
-                'number': match.group(2),
-                'unit': match.group(3)
-            })
+        values.extend(
+            {'type': 'threshold', 'value': value, 'operator': operator, 'number': number, 'unit': unit}
+            for value, operator, number, unit in (scan['threshold'] if scan else _THRESHOLD_RE.findall(text))
+        )
         
         return values
     
@@ -202,12 +487,12 @@ class AASLDDataCleaner:
                 if isinstance(section, dict):
                     heading = self.clean_text(section.get('heading', ''))
                     # Skip navigation sections
-                    if any(nav in heading.lower() for nav in ['logo', 'navigation', 'cookie', 'privacy']):
+                    if _SKIP_HEADING_RE.search(heading.lower()):
                         continue
                     
                     section_content = section.get('content', [])
                     if isinstance(section_content, list):
-                        cleaned_content = [self.clean_text(str(item)) for item in section_content]
+                        cleaned_content = [self.clean_text(_as_text(item)) for item in section_content]
                         cleaned_content = [c for c in cleaned_content if len(c) > 10]  # Remove very short items
                         
                         if heading or cleaned_content:
@@ -223,18 +508,19 @@ class AASLDDataCleaner:
                 if isinstance(table, dict):
                     cleaned_table = {
                         'caption': self.clean_text(table.get('caption', '')),
-                        'headers': [self.clean_text(str(h)) for h in table.get('headers', [])],
+                        'headers': [self.clean_text(_as_text(h)) for h in table.get('headers', [])],
                         'rows': []
                     }
                     for row in table.get('rows', []):
                         if isinstance(row, list):
-                            cleaned_row = [self.clean_text(str(cell)) for cell in row]
+                            cleaned_row = [self.clean_text(_as_text(cell)) for cell in row]
                             cleaned_table['rows'].append(cleaned_row)
                     cleaned['tables'].append(cleaned_table)
         
         # Extract recommendations and clinical values from full text
-        cleaned['recommendations'] = self.extract_recommendations(cleaned['full_text'])
-        cleaned['clinical_values'] = self.extract_clinical_values(cleaned['full_text'])
+        scan = self._scan_all(cleaned['full_text'])
+        cleaned['recommendations'] = self.extract_recommendations(cleaned['full_text'], scan)
+        cleaned['clinical_values'] = self.extract_clinical_values(cleaned['full_text'], scan)
         
         # Preserve metadata
         cleaned['word_count'] = content.get('word_count', 0)
@@ -256,13 +542,14 @@ class AASLDDataCleaner:
         # Clean paragraphs
         if 'paragraphs' in content and isinstance(content['paragraphs'], list):
             for para in content['paragraphs']:
-                cleaned_para = self.clean_text(str(para))
+                cleaned_para = self.clean_text(_as_text(para))
                 if len(cleaned_para) > 10:  # Remove very short paragraphs
                     cleaned['paragraphs'].append(cleaned_para)
         
         # Extract recommendations and clinical values
-        cleaned['recommendations'] = self.extract_recommendations(cleaned['full_text'])
-        cleaned['clinical_values'] = self.extract_clinical_values(cleaned['full_text'])
+        scan = self._scan_all(cleaned['full_text'])
+        cleaned['recommendations'] = self.extract_recommendations(cleaned['full_text'], scan)
+        cleaned['clinical_values'] = self.extract_clinical_values(cleaned['full_text'], scan)
         
         # Preserve metadata
         cleaned['word_count'] = content.get('word_count', 0)
@@ -271,11 +558,12 @@ class AASLDDataCleaner:
         
         return cleaned
     
-    def clean_file(self, filepath: Path) -> Optional[Dict[str, Any]]:
-        """Clean a single JSON file"""
+    def clean_file(self, filepath: Path, cleaned_at: Optional[str] = None,
+                   data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Clean a single JSON file (data, if given, is its already-parsed content)"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if data is None:
+                data = load_json(filepath)
             
             cleaned_data = {
                 'file_id': filepath.stem,
@@ -299,8 +587,8 @@ class AASLDDataCleaner:
                         'full_text': self.clean_text(data['content'].get('full_text', ''))
                     }
             
-            # Add extraction date
-            cleaned_data['cleaned_at'] = datetime.now().isoformat()
+            # Add extraction date (batch runs pass one shared timestamp)
+            cleaned_data['cleaned_at'] = cleaned_at or datetime.now().isoformat()
             
             return cleaned_data
             
@@ -308,14 +596,81 @@ class AASLDDataCleaner:
             print(f"Error cleaning {filepath}: {e}")
             return None
     
-    def process_all_files(self) -> Dict[str, Any]:
-        """Process all JSON files in the input directory"""
-        json_files = list(self.input_dir.glob('*.json'))
+    def output_path(self, filepath: Path) -> Path:
+        return self.output_dir / f"{filepath.stem}_cleaned.json"
+    
+    def clean_and_save(self, filepath: Path, cleaned_at: Optional[str] = None,
+                       previous: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Clean a file, write its cleaned JSON, and return its summary entry.
+        
+        previous is the file's entry from the last summary; if the input bytes
+        still hash the same, the saved output is kept and that entry returned.
+        """
+        output_file = self.output_path(filepath)
+        try:
+            with json_buffer(filepath) as buffer:
+                source_hash = hashlib.sha256(buffer).hexdigest()
+                # mtimes don't survive every copy or checkout; the content hash does
+                if previous and previous.get('source_hash') == source_hash and output_file.exists():
+                    os.utime(output_file)
+                    return previous
+                data = parse_json(buffer)
+        except Exception as e:
+            print(f"Error cleaning {filepath}: {e}")
+            return None
+        
+        cleaned_data = self.clean_file(filepath, cleaned_at, data)
+        if not cleaned_data:
+            return None
+        cleaned_data['source_hash'] = source_hash
+        
+        try:
+            save_json(output_file, cleaned_data)
+        except Exception as e:
+            print(f"Error saving {filepath}: {e}")
+            return None
+        
+        entry = self.summary_entry(cleaned_data)
+        entry['source_hash'] = source_hash
+        return entry
+    
+    def load_previous_entries(self) -> Dict[str, Dict[str, Any]]:
+        """Per-file entries from the last cleaning_summary.json, keyed by file_id"""
+        try:
+            files = load_json(self.output_dir / 'cleaning_summary.json')['files']
+            return {entry['file_id']: entry for entry in files if 'word_count' in entry}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+    
+    def output_is_current(self, filepath: Path) -> bool:
+        """True if filepath's saved output is at least as new as the input"""
+        try:
+            return self.output_path(filepath).stat().st_mtime >= filepath.stat().st_mtime
+        except OSError:
+            return False
+    
+    @staticmethod
+    def summary_entry(cleaned_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Summary fields for one cleaned file"""
+        content = cleaned_data.get('content', {})
+        return {
+            'file_id': cleaned_data['file_id'],
+            'title': cleaned_data['page_title'],
+            'type': cleaned_data['content_type'],
+            'url': cleaned_data['page_url'],
+            'recommendations_count': len(content.get('recommendations', [])),
+            'clinical_values_count': len(content.get('clinical_values', [])),
+            'word_count': content.get('word_count', 0)
+        }
+    
+    def process_all_files(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Process all JSON files in the input directory, one worker process per core"""
+        json_files = sorted(self.input_dir.glob('*.json'))
         total_files = len(json_files)
         
         print(f"Processing {total_files} JSON files...")
         
-        cleaned_files = []
+        file_entries = []
         stats = {
             'total_files': total_files,
             'successful': 0,
@@ -327,53 +682,80 @@ class AASLDDataCleaner:
             'total_words': 0
         }
         
-        for i, filepath in enumerate(sorted(json_files), 1):
-            print(f"Processing {i}/{total_files}: {filepath.name}")
-            
-            cleaned_data = self.clean_file(filepath)
-            
-            if cleaned_data:
-                # Save cleaned file
-                output_file = self.output_dir / f"{filepath.stem}_cleaned.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
-                
-                cleaned_files.append(cleaned_data)
+        # Files are independent and CPU-bound; in per-file mode workers clean
+        # and write them and only the small summary entries come back to this
+        # process. Batched formats return the cleaned data to be written here.
+        # Either way writes overlap with cleaning: a worker blocked on disk
+        # leaves the other workers busy, and results queue while this process
+        # writes, so no separate writer pool is needed.
+        # Largest files are dispatched first, one at a time, so a long guideline
+        # never starts last and leaves the other workers idle.
+        batch_ts = datetime.now().isoformat()
+        results = {}
+        per_file = self.output_format == 'per-file'
+        
+        # Per-file outputs at least as new as their input keep their last summary entry
+        previous = {} if self.force or not per_file else self.load_previous_entries()
+        pending = []
+        for filepath in json_files:
+            entry = previous.get(filepath.stem)
+            if entry and self.output_is_current(filepath):
+                results[filepath] = entry
+            else:
+                pending.append(filepath)
+        if results:
+            print(f"  Skipping {len(results)} unchanged file(s)")
+        
+        schedule = sorted(pending, key=lambda p: p.stat().st_size, reverse=True)
+        sink = None if per_file else BatchSink(self.output_dir, self.output_format)
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+                if per_file:
+                    previous_entries = [previous.get(p.stem) for p in schedule]
+                    mapped = executor.map(self.clean_and_save, schedule, repeat(batch_ts), previous_entries)
+                else:
+                    mapped = executor.map(self.clean_file, schedule, repeat(batch_ts))
+                outputs = zip(schedule, mapped)
+                if tqdm:
+                    outputs = tqdm(outputs, total=len(schedule), desc="Cleaning", unit="file")
+                for i, (filepath, output) in enumerate(outputs, 1):
+                    if not tqdm:
+                        print(f"Processing {i}/{len(schedule)}: {filepath.name}")
+                    if sink and output:
+                        sink.add(output)
+                        output = self.summary_entry(output)
+                    results[filepath] = output
+        finally:
+            if sink:
+                sink.close()
+        
+        for filepath in json_files:
+            entry = results[filepath]
+            if entry:
+                file_entries.append(entry)
                 stats['successful'] += 1
                 
                 # Update stats
-                if cleaned_data['content_type'] == 'html':
+                if entry['type'] == 'html':
                     stats['html_files'] += 1
-                elif cleaned_data['content_type'] == 'pdf':
+                elif entry['type'] == 'pdf':
                     stats['pdf_files'] += 1
                 
-                content = cleaned_data.get('content', {})
-                stats['total_recommendations'] += len(content.get('recommendations', []))
-                stats['total_clinical_values'] += len(content.get('clinical_values', []))
-                stats['total_words'] += content.get('word_count', 0)
+                stats['total_recommendations'] += entry['recommendations_count']
+                stats['total_clinical_values'] += entry['clinical_values_count']
+                stats['total_words'] += entry['word_count']
             else:
                 stats['failed'] += 1
         
         # Save summary
         summary = {
-            'cleaning_date': datetime.now().isoformat(),
+            'cleaning_date': batch_ts,
             'statistics': stats,
-            'files': [
-                {
-                    'file_id': f['file_id'],
-                    'title': f['page_title'],
-                    'type': f['content_type'],
-                    'url': f['page_url'],
-                    'recommendations_count': len(f.get('content', {}).get('recommendations', [])),
-                    'clinical_values_count': len(f.get('content', {}).get('clinical_values', []))
-                }
-                for f in cleaned_files
-            ]
+            'files': file_entries
         }
         
         summary_file = self.output_dir / 'cleaning_summary.json'
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        save_json(summary_file, summary)
         
         print(f"\nCleaning complete!")
         print(f"  Successful: {stats['successful']}/{total_files}")
@@ -385,12 +767,72 @@ class AASLDDataCleaner:
         return summary
 
 
+class BatchSink:
+    """Collects a whole batch into one cleaned.ndjson or cleaned.parquet file"""
+    
+    PARQUET_COLUMNS = {
+        'file_ids': lambda d: d['file_id'],
+        'urls': lambda d: d['page_url'],
+        'types': lambda d: d['content_type'],
+        'titles': lambda d: d['page_title'],
+        'full_texts': lambda d: d.get('content', {}).get('full_text', ''),
+        'rec_counts': lambda d: len(d.get('content', {}).get('recommendations', [])),
+        'cv_counts': lambda d: len(d.get('content', {}).get('clinical_values', [])),
+    }
+    
+    def __init__(self, output_dir: Path, output_format: str):
+        self.output_format = output_format
+        if output_format == 'ndjson':
+            self.path = output_dir / 'cleaned.ndjson'
+            # One buffered file instead of a small write per document
+            self.out = open(self.path, 'wb', buffering=1 << 20)
+        elif output_format == 'parquet':
+            if pa is None:
+                raise ImportError("parquet output requires pyarrow (pip install pyarrow)")
+            self.path = output_dir / 'cleaned.parquet'
+            self.columns = {name: [] for name in self.PARQUET_COLUMNS}
+        else:
+            raise ValueError(f"BatchSink handles 'ndjson' or 'parquet', got {output_format!r}")
+    
+    def add(self, cleaned_data: Dict[str, Any]):
+        if self.output_format == 'ndjson':
+            self.out.write(dump_json_line(cleaned_data))
+            return
+        for name, get in self.PARQUET_COLUMNS.items():
+            self.columns[name].append(get(cleaned_data))
+    
+    def close(self):
+        if self.output_format == 'ndjson':
+            self.out.close()
+            return
+        pq.write_table(pa.Table.from_pydict(self.columns), self.path)
+
+
+@lru_cache(maxsize=200_000)
+def _clean_text_cached(text: str) -> str:
+    return AASLDDataCleaner._clean_text_uncached(text)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Clean AASLD guideline JSON files for RAG indexing")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="per-file",
+                        help="one JSON per file, a single cleaned.ndjson, or a single cleaned.parquet "
+                             "(default: per-file)")
+    parser.add_argument("--force", action="store_true",
+                        help="re-clean every file even if its cleaned output is up to date (per-file format)")
+    args = parser.parse_args()
+    if args.output_format == 'parquet' and pa is None:
+        parser.error("parquet output requires pyarrow (pip install pyarrow)")
+    return args
+
+
 def main():
     """Main execution function"""
+    args = parse_args()
     input_dir = Path(__file__).parent
     output_dir = input_dir / "cleaned_data"
     
-    cleaner = AASLDDataCleaner(input_dir, output_dir)
+    cleaner = AASLDDataCleaner(input_dir, output_dir, args.output_format, args.force)
     summary = cleaner.process_all_files()
     
     return summary